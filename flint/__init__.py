@@ -6,13 +6,30 @@ License, v. 2.0. If a copy of the MPL was not distributed with this
 file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 from types import FunctionType as Function
-from typing import Set
-from functools import lru_cache
+from typing import Callable, Set, Tuple, Any, Optional
+from functools import lru_cache, wraps
+from importlib.machinery import EXTENSION_SUFFIXES
+import concurrent.futures
+import contextlib
+import tempfile
 import warnings
+import hashlib
+import pickle
+import sys
+import os
 
 warnings.formatwarning = lambda message, *args, **kwargs: f'{message!s}\n'  # patch formatter to only show message
 central_cache: Set[object] = set()
 
+# the disk cache persists parsed INIs and the results of routines between runs, but this is opt-in. Set
+# FLINT_DISK_CACHE=1 to enable it
+disk_cache_enabled = os.environ.get('FLINT_DISK_CACHE') == '1'
+# INIs can be parsed in parallel in a pool of worker processes, but this is opt-in: where processes are spawned rather
+# than forked, scripts using flint must then guard their entry point with `if __name__ == '__main__'`. Set
+# FLINT_PROCESS_POOL=1 to enable it
+process_pool_enabled = os.environ.get('FLINT_PROCESS_POOL') == '1'
+disk_cache_directory = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'flint')
+
 
 def cached(function: Function) -> Function:
     """A decorator which caches a function to the central cache."""
@@ -22,6 +39,127 @@ def cached(function: Function) -> Function:
     return wrapped
 
 
+def disk_cached(restore: Callable[[Any], Any] = lambda result: result) -> Callable[[Function], Function]:
+    """A decorator which persists the results of a function taking a file path, and optionally further arguments with
+    a stable repr, to the disk cache if `disk_cache_enabled` is true. Results are keyed on those arguments and the
+    path, modification time and size of the file, so modifying it invalidates them. They are also keyed on the
+    signatures of flint's own source files, so that upgrading flint does too. Results loaded from the cache are passed
+    through `restore`, e.g. to re-intern the strings they contain, which pickling does not preserve.
+
+    The key for a given set of arguments (or None if the disk cache is disabled) is available as the `cache_key`
+    attribute of the decorated function, for callers which manage the cache for many files at once."""
+    def decorator(function: Function) -> Function:
+        def cache_key(path: str, *args) -> Optional[str]:
+            if not disk_cache_enabled:
+                return None
+            return disk_cache_key((function.__qualname__, path, args), (package_signature(), file_signature(path)))
+
+        @wraps(function)
+        def wrapper(path: str, *args):
+            key = cache_key(path, *args)
+            if key is None:
+                return function(path, *args)
+            try:
+                return restore(disk_cache_load(key))
+            except KeyError:
+                result = function(path, *args)
+                disk_cache_store(key, result)
+                return result
+        wrapper.cache_key = cache_key
+        return wrapper
+    return decorator
+
+
+def disk_cached_routine(*categories: str) -> Callable[[Function], Function]:
+    """A decorator for routines taking no arguments which persists their results to the disk cache if
+    `disk_cache_enabled` is true. Results are keyed on the signatures of every file in the given INI categories (see
+    `paths.inis`), so that modifying any of them invalidates the result, and on the signatures of flint's own source
+    files, as results are made of its classes. Results which cannot be pickled are not persisted."""
+    def decorator(function: Function) -> Function:
+        @wraps(function)
+        def wrapper():
+            if not disk_cache_enabled:
+                return function()
+            from . import paths
+            dependencies = sorted({path for category in categories for path in paths.inis.get(category, ())})
+            signatures = tuple(map(file_signature, dependencies))
+            key = disk_cache_key((function.__qualname__,), (package_signature(), signatures))
+            try:
+                return disk_cache_load(key)
+            except KeyError:
+                result = function()
+                disk_cache_store(key, result)
+                return result
+        return wrapper
+    return decorator
+
+
+@lru_cache(maxsize=None)
+def package_signature() -> Tuple[Tuple[str, int, int], ...]:
+    """The signatures of all of flint's modules, which change when flint is upgraded or rebuilt."""
+    root = os.path.dirname(__file__)
+    return tuple(file_signature(os.path.join(directory, file))
+                 for directory, _, files in sorted(os.walk(root)) for file in sorted(files)
+                 if file.endswith(('.py', *EXTENSION_SUFFIXES)))
+
+
+def file_signature(path: str) -> Tuple[str, int, int]:
+    """A tuple of the path, modification time (in nanoseconds) and size of a file, which changes when it is modified."""
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def disk_cache_key(slot: tuple, version: tuple) -> str:
+    """Form a key for the disk cache from the (reprable) parts identifying what is stored, `slot`, and the parts
+    identifying which version of it is current, `version` (e.g. the signatures of the files it was derived from). Only
+    the latest version stored in each slot is kept."""
+    slot_hash, version_hash = (hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+                               for parts in (slot, version))
+    return os.path.join(slot_hash, version_hash)
+
+
+def disk_cache_load(key: str) -> Any:
+    """Load the object stored in the disk cache under `key`. If there is no such object, or it cannot be read, raise
+    KeyError."""
+    try:
+        with open(os.path.join(disk_cache_directory, key + '.pkl'), 'rb') as f:
+            return pickle.load(f)
+    except Exception as e:  # a missing, truncated or stale entry is just a miss
+        raise KeyError(key) from e
+
+
+def disk_cache_contains(key: Optional[str]) -> bool:
+    """Whether an object is stored in the disk cache under `key`. A key of None (i.e. the cache is disabled) is never
+    contained."""
+    return key is not None and os.path.isfile(os.path.join(disk_cache_directory, key + '.pkl'))
+
+
+def disk_cache_store(key: str, value: Any):
+    """Store an object in the disk cache under `key`, removing any other versions stored in the same slot (see
+    `disk_cache_key`), which are now stale. Failure to write to the cache is silently ignored."""
+    path = os.path.join(disk_cache_directory, key + '.pkl')
+    slot_directory = os.path.dirname(path)
+    try:
+        os.makedirs(slot_directory, exist_ok=True)
+        # write to a temporary file first so that concurrent readers never see a partially written entry
+        f = tempfile.NamedTemporaryFile('wb', dir=slot_directory, delete=False)
+    except OSError:
+        return
+    try:
+        with f:
+            pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, path)
+    except (OSError, pickle.PicklingError, AttributeError, TypeError):  # the latter two for some unpicklable objects
+        with contextlib.suppress(OSError):
+            os.remove(f.name)
+        return
+
+    with contextlib.suppress(OSError), os.scandir(slot_directory) as entries:
+        for entry in entries:
+            if entry.name.endswith('.pkl') and entry.name != os.path.basename(path):
+                os.remove(entry.path)
+
+
 def invalidate_cache():
     """Invalidate (empty) the central cache."""
     for f in central_cache:
@@ -31,6 +169,32 @@ def invalidate_cache():
 
 from .paths import set_install_path, install_path_set
 from .routines import get_commodities, get_bases, get_equipment, get_ships, get_systems, get_factions, get_goods
+from .routines import get_markets, preload_system_contents
+
+
+def warm(max_workers=4, system_contents=False):
+    """Populate the cache for every routine in advance, so that later calls return immediately. Routines which do not
+    depend on each other are run concurrently in a pool of `max_workers` threads, so that one can proceed while another
+    waits on the disk or on the pool of processes which parses INIs. Routines which depend on the results of others,
+    or which parse the same files as another (a cached call still in progress cannot be shared), are only started once
+    those have completed, so that no routine or file is processed twice.
+
+    If `system_contents` is true, the contents of every system (see `System.contents`) are loaded too."""
+    assert install_path_set(), 'No game path set'
+    stages = [(get_systems, get_factions, get_goods, get_equipment, get_ships),
+              (get_bases, get_commodities),  # get_bases parses universe.ini, as get_systems does
+              (get_markets,)]  # this depends on routines in both earlier stages
+    if system_contents:
+        stages[1] += (preload_system_contents,)
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
+            for stage in stages:
+                for future in [pool.submit(routine) for routine in stage]:
+                    future.result()
+    finally:  # release the contents of any prefetched files which were not read
+        from .formats import ini
+        ini.prefetched.clear()
 
 
 shorthand = {'bases': get_bases,
@@ -12,6 +12,7 @@ from typing import TypeVar, Iterable, Generic, Type, Optional, Dict, Union
 from collections.abc import Mapping, KeysView, ItemsView
 import operator
 import pprint
+import sys
 
 from dataclassy import dataclass, as_dict
 
@@ -76,6 +77,7 @@ class EntitySet(Mapping, Generic[T]):
             self._map = entities
         else:
             self._map = {e.nickname: e for e in entities}
+        self._hash = None
 
     def __repr__(self):
         return f'EntitySet({pprint.pformat(self._map)})'
@@ -86,6 +88,11 @@ class EntitySet(Mapping, Generic[T]):
         assert type(key) is str, repr(type(key))
         return self._map[key]
 
+    def get(self, key: str, default=None) -> Optional[T]:
+        """Look up an entity by nickname directly in the map, without the exception raised by a failed `__getitem__`
+        that the inherited implementation relies upon."""
+        return self._map.get(key, default) if type(key) is str else default
+
     def __iter__(self):
         """Iteration is over values."""
         return iter(self._map.values())
@@ -105,8 +112,20 @@ class EntitySet(Mapping, Generic[T]):
         return self._map == other._map
 
     def __hash__(self):
-        """The set of keys is constant for an EntitySet and allows it to be hashed."""
-        return hash(frozenset(self._map))
+        """The set of keys is constant for an EntitySet and allows it to be hashed. As this hash is needed every time
+        a cached method is called, it is only computed once."""
+        if self._hash is None:
+            self._hash = hash(frozenset(self._map))
+        return self._hash
+
+    def __reduce__(self):
+        """Pickle only the map. String hashes vary between interpreters, so the memoised hash must not be kept."""
+        return EntitySet, ({},), self._map
+
+    def __setstate__(self, state: Dict[str, T]):
+        """Restore the map from a pickle, re-interning its keys (which pickling does not preserve) so that lookups by
+        nicknames read from the game files can be compared by identity."""
+        self._map = {sys.intern(k) if type(k) is str else k: v for k, v in state.items()}
 
     def __add__(self, other) -> 'EntitySet[T]':
         """Two EntitySets can be added together to create a new EntitySet."""
@@ -129,7 +148,7 @@ class EntitySet(Mapping, Generic[T]):
     @cached
     def of_type(self, type_: Type[F]) -> 'EntitySet[F]':
         """Return a new, homogeneous EntitySet containing only Entities which are instances of the given type."""
-        return EntitySet(filter(lambda e: isinstance(e, type_), self))
+        return EntitySet({nickname: e for nickname, e in self._map.items() if isinstance(e, type_)})
 
     @cached
     def reindex(self, on: str) -> 'EntitySet[T]':
@@ -32,7 +32,7 @@ class Good(Entity):
 
     def market(self) -> Dict[bool, Dict['Base', int]]:
         """The market for this Good, i.e. the Bases it is bought and sold on and their prices."""
-        return routines.get_markets()[self]
+        return routines.get_markets().get(self) or routines.new_market()
 
     def sold_at(self) -> Dict['Base', int]:
         """A dict of bases that sell this good of the form {base_nickname: price}."""
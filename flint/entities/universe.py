@@ -141,7 +141,7 @@ class Base(Entity):
             return self.solar().sector()
 
     def market(self):
-        return routines.get_markets()[self]
+        return routines.get_markets().get(self) or routines.new_market()
 
     def sells(self) -> Dict['Good', int]:
         """The goods this base sells, of the form {good -> price}."""
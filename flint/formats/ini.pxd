@@ -0,0 +1,19 @@
+# Copyright (C) 2016, 2017, 2020 biqqles.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Static type declarations for the hot path of ini.py, used when the
+# module is compiled with Cython (see setup.py). ini.py itself remains
+# plain Python and is imported as-is when no extension has been built.
+cimport cython
+
+@cython.locals(section_name=str, delimiter=str, entries=str)
+cpdef tuple parse_section(str section)
+
+@cython.locals(key=str, delimiter=str, value=str)
+cpdef tuple parse_entry(str entry)
+
+cpdef object parse_value(str entry_value)
+
@@ -17,18 +17,26 @@ This file is intended to be the main interface for accessing INI
 *and* BINI functions, as it contains higher-level functions as well
 as logic for checking whether a .ini file is an INI or a BINI.
 """
-from typing import Union, List, Dict, Any, Tuple
+from typing import Union, List, Dict, Any, Iterator, Tuple, Optional
 from collections import defaultdict
+from functools import lru_cache
 import concurrent.futures
+import multiprocessing
+import threading
+import atexit
 import itertools
 import warnings
+import os
+import sys
+import re
 
-from .. import cached
+from .. import cached, disk_cached, disk_cache_load, disk_cache_store, file_signature
 from . import bini
 
 
 @cached
-def sections(paths: Union[str, Tuple[str]], fold_sections=False, fold_values=True) -> Dict[str, Any]:
+def sections(paths: Union[str, Tuple[str]], fold_sections=False, fold_values=True,
+             target_section: Optional[str] = None) -> Dict[str, Any]:
     """Parse the Freelancer-style INI file(s) at `paths` and group sections of the same name together.
 
     THe result is a dict mapping a section name to a list of dictionaries representing the contents of each section
@@ -37,21 +45,94 @@ def sections(paths: Union[str, Tuple[str]], fold_sections=False, fold_values=Tru
 
     If `fold_values` is true (the default), the same logic applies to entries and their values: if an entry is only
     defined once in a section, its value is "folded" into a primitive (a float, int, bool or string) rather than being a
-    list."""
-    return fold_dict(parse(paths, fold_values), fold_sections)
+    list.
 
+    If `target_section` is given, only sections with that name are parsed (see `parse`)."""
+    return fold_dict(parse(paths, fold_values, target_section), fold_sections)
 
-def parse(paths: Union[str, Tuple[str]], fold_values=True) -> List[Tuple[str, Dict[str, Any]]]:
+
+def parse(paths: Union[str, Tuple[str]], fold_values=True,
+          target_section: Optional[str] = None) -> List[Tuple[str, Dict[str, Any]]]:
     """Parse an INI file, or a collection of INIs, to a list of tuples of the form (section_name, section_contents),
     where section_contents is a dict of the entries in that section. If fold_values is true (the default), the
-    entries dict will be "folded" (see the docstring for `fold_dict`)."""
+    entries dict will be "folded" (see the docstring for `fold_dict`).
+
+    If `target_section` is given, only sections with that name are included in the result. This is much faster than
+    filtering the result afterwards, as other sections are skipped without being parsed at all."""
     if isinstance(paths, str):  # accept both single paths and tuples of paths
         paths = [paths]
 
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        sections_ = itertools.chain(*executor.map(parse_file, paths))
+    if len(paths) > 1:
+        sections_ = itertools.chain(*parse_many(paths, target_section))
+    else:
+        sections_ = itertools.chain(*map(parse_file, paths, itertools.repeat(target_section)))
+
+    return [(name, fold_dict(entries, fold_values)) for name, entries in sections_]
+
+
+def parse_many(paths: List[str], target_section: Optional[str] = None) -> List[list]:
+    """Equivalent to `[parse_file(path, target_section) for path in paths]`, but for many files at once.
+
+    Results are first looked up in the disk cache. The remaining files are read and parsed in a pool of threads. If
+    the process pool is enabled (see `flint.process_pool_enabled`), they are instead read in the pool of threads
+    (reading is I/O-bound and releases the GIL) and each is handed to the pool of processes to be parsed (which is
+    CPU-bound) as soon as it has been read, so that reading later files overlaps with parsing earlier ones."""
+    from .. import process_pool_enabled
+
+    results = [None] * len(paths)
+    keys = [parse_file.cache_key(path, target_section) for path in paths]
+    misses = []
+    for i, key in enumerate(keys):
+        if key is not None:
+            try:
+                results[i] = intern_sections(disk_cache_load(key))
+                continue
+            except KeyError:
+                pass
+        misses.append(i)
+
+    # worker processes never start pools of their own
+    if process_pool_enabled and multiprocessing.current_process().name == 'MainProcess':
+        with concurrent.futures.ThreadPoolExecutor() as readers:
+            reads = {readers.submit(read_file, paths[i]): i for i in misses}
+            parses = {reads[read]: process_pool().submit(parse_data_collecting_warnings, read.result(), target_section)
+                      for read in concurrent.futures.as_completed(reads)}
+        for i in misses:
+            sections_, caught = parses[i].result()
+            results[i] = intern_sections(sections_)
+            for message in caught:  # raise warnings from workers in this process, where the caller can see them
+                warnings.warn(message)
+    else:
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            for i, result in zip(misses, executor.map(parse_uncached, [paths[i] for i in misses],
+                                                      itertools.repeat(target_section))):
+                results[i] = result
+
+    for i in misses:
+        if keys[i] is not None:
+            disk_cache_store(keys[i], results[i])
+    return results
+
 
-    return [(name, fold_dict(entries, fold_values)) for name, entries in filter(None, sections_)]
+def process_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """The pool of worker processes used by `parse_many` to parse multiple files in parallel. It is created on first
+    use and persists for the lifetime of the interpreter, so the cost of starting workers is only paid once. Workers
+    are spawned rather than forked on every platform, as the pool may be started while other threads are running
+    (see `flint.warm`)."""
+    global _pool
+    with _pool_lock:  # routines may be run from several threads at once (see `flint.warm`)
+        if _pool is None:
+            context = {'mp_context': multiprocessing.get_context('spawn')} if sys.version_info >= (3, 7) else {}
+            _pool = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count(), **context)
+            atexit.register(_pool.shutdown)  # before module teardown, which can otherwise race the pool's own cleanup
+    return _pool
+
+
+def stream(path: str, fold_values=True, target_section: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Like `parse` for a single file, but lazily yields each section in turn, so that consumers which process one
+    section at a time never hold the folded contents of the whole file at once."""
+    for name, entries in parse_file(path, target_section):
+        yield name, fold_dict(entries, fold_values)
 
 
 def group(paths: Union[str, Tuple[str]], fold_sections=True, fold_values=True):
@@ -60,15 +141,117 @@ def group(paths: Union[str, Tuple[str]], fold_sections=True, fold_values=True):
     return [next(iter(fold_dict(contents, fold_sections).items())) for key, contents in groups]
 
 
-def parse_file(path: str):
+def intern_sections(sections_: List[tuple]) -> List[tuple]:
+    """Intern the section names, entry keys and string values of the output of `parse_file`, as parsing does. This is
+    needed for output which has been through pickle (i.e. from the disk cache or the pool of processes), which
+    preserves the contents of strings but not their identity."""
+    return [(sys.intern(name), [entry and (sys.intern(entry[0]), intern_value(entry[1])) for entry in entries])
+            for name, entries in sections_]
+
+
+def intern_value(value: Any) -> Any:
+    """Intern a parsed value if it is a string, or the strings in it if it is a tuple."""
+    if type(value) is str:
+        return sys.intern(value)
+    if type(value) is tuple:
+        return tuple(sys.intern(v) if type(v) is str else v for v in value)
+    return value
+
+
+@disk_cached(restore=intern_sections)
+def parse_file(path: str, target_section: Optional[str] = None):
     """Takes a path to an INI or BINI file and outputs a list of tuples containing a section name and a list of tuples
-    of entry/value pairs."""
-    if bini.is_bini(path):
-        return bini.parse_file(path)
-    with open(path, encoding='windows-1252') as f:
-        contents = f.read().lower()  # files are case insensitive
-    contents.replace(DELIMITER_COMMENT + SECTION_NAME_START, '')  # delete commented section markers
-    return list(map(parse_section, contents.split(SECTION_NAME_START)))
+    of entry/value pairs for each valid section. If `target_section` is given, only sections with that name are
+    output."""
+    return parse_uncached(path, target_section)
+
+
+def parse_uncached(path: str, target_section: Optional[str] = None):
+    """Equivalent to `parse_file`, but bypassing the disk cache."""
+    return parse_data(read_file(path), target_section)
+
+
+def read_file(path: str) -> bytes:
+    """Read the contents of the file at `path`. This is read once and the magic number is checked in memory, rather
+    than reopening the file. If the file's contents have been prefetched (see `paths.prefetch`) and it has not been
+    modified since, those are used instead."""
+    signature, data = prefetched.pop(path, (None, None))
+    if data is not None and signature == file_signature(path):
+        return data
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def parse_data(data: bytes, target_section: Optional[str] = None):
+    """Takes the contents of an INI or BINI file and outputs the same as `parse_file`."""
+    if data[:4] == bini.MAGIC:
+        sections_ = bini.parse(data)
+        return sections_ if target_section is None else [s for s in sections_ if s[0] == target_section.lower()]
+    contents = data.translate(LOWERCASE_TABLE).decode('windows-1252')  # files are case insensitive
+    if target_section is None:
+        return list(filter(None, map(parse_section, split_sections(contents))))  # drop invalid sections
+    return list(filter(None, map(parse_section, find_sections(contents, target_section.lower()))))
+
+
+def parse_data_collecting_warnings(data: bytes, target_section: Optional[str] = None):
+    """Run `parse_data` in a worker process, returning its result along with the warnings it raised, which would
+    otherwise never reach the parent process."""
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        sections_ = parse_data(data, target_section)
+    return sections_, [w.message for w in caught]
+
+
+def split_sections(contents: str):
+    """Split `contents` at each section header, yielding each raw section lazily by slicing between them. Sections
+    whose header has been commented out (e.g. ";[Object]") are skipped entirely, up to the next header, as the game
+    does."""
+    start, commented = 0, False
+    while True:
+        end, next_commented = find_header(contents, start)
+        if not commented:
+            yield contents[start:] if end == -1 else contents[start:end]
+        if end == -1:
+            return
+        start, commented = end + 1, next_commented
+
+
+def find_sections(contents: str, name: str):
+    """Yields the same raw sections as `split_sections`, but only those named `name`. Rather than visiting every
+    section, this jumps directly from one header with this name to the next."""
+    header = SECTION_NAME_START + name + SECTION_NAME_END
+    start = find_marker(contents, header, 0)
+    while start != -1:
+        end, _ = find_header(contents, start + 1)
+        if end == -1:
+            yield contents[start + 1:]
+            return
+        yield contents[start + 1:end]
+        start = find_marker(contents, header, end)
+
+
+def find_header(contents: str, start: int) -> Tuple[int, bool]:
+    """Return the index of the first section header in `contents` at or after `start`, and whether that header has
+    been commented out, or (-1, False) if there is none. Section markers which follow anything but comment delimiters
+    and whitespace within a comment (e.g. "x = 1 ; [see above]") do not form a header and are ignored."""
+    index = contents.find(SECTION_NAME_START, start)
+    while index != -1:
+        line_start = contents.rfind('\n', 0, index) + 1
+        if contents.find(DELIMITER_COMMENT, line_start, index) == -1:
+            return index, False
+        if not contents[line_start:index].strip(DELIMITER_COMMENT + ' \t'):
+            return index, True
+        index = contents.find(SECTION_NAME_START, index + 1)
+    return -1, False
+
+
+def find_marker(contents: str, marker: str, start: int) -> int:
+    """Return the index of the first occurrence of `marker` in `contents` at or after `start` that is not preceded by a
+    comment delimiter on the same line, or -1 if there is none."""
+    index = contents.find(marker, start)
+    while index != -1 and contents.find(DELIMITER_COMMENT, contents.rfind('\n', 0, index) + 1, index) != -1:
+        index = contents.find(marker, index + 1)
+    return index
 
 
 def parse_section(section: str):
@@ -78,7 +261,7 @@ def parse_section(section: str):
     if not delimiter or (DELIMITER_COMMENT in section_name):
         return ()
     try:
-        return section_name, list(map(parse_entry, entries.splitlines()))
+        return sys.intern(section_name), list(map(parse_entry, entries.splitlines()))
     except ValueError as e:  # an entry with a syntax error invalidates the whole section
         warnings.warn(f"Couldn't parse line in section {section_name!r}; {e}")
         return ()
@@ -87,11 +270,11 @@ def parse_section(section: str):
 def parse_entry(entry: str):
     """Takes an entry string consisting of a delimiter separated key/value pair and outputs a tuple of the
     name and value. If the entry is invalid, an empty tuple will be returned."""
-    entry = entry.split(DELIMITER_COMMENT, 1)[0]  # remove comments
+    entry = entry.partition(DELIMITER_COMMENT)[0]  # remove comments
     key, delimiter, value = entry.partition(DELIMITER_KEY_VALUE)
     if not delimiter:  # if this isn't a valid entry line after all
         return ()
-    return key.strip(), parse_value(value)
+    return sys.intern(key.strip()), parse_value(value)  # keys are few and looked up often, so intern them
 
 
 def parse_value(entry_value: str) -> Union[Any, Tuple]:
@@ -100,20 +283,31 @@ def parse_value(entry_value: str) -> Union[Any, Tuple]:
     return tuple(map(auto_cast, entry_value.split(','))) if ',' in entry_value else auto_cast(entry_value)
 
 
+@lru_cache(maxsize=4096)
 def auto_cast(value: str) -> Any:
     """Interpret and coerce a string value to a Python type. If the value cannot be interpreted as a valid Python type,
-    a `ValueError` will be raised."""
+    a `ValueError` will be raised.
+
+    INIs repeat a small vocabulary of values (booleans, small numbers, nicknames) many times over, so results are
+    memoised. This is safe because both the input and output are immutable. String values are also interned, so that
+    every occurrence of a value shares one object even once it has been evicted from the cache."""
     value = value.strip()
     if not (value[:1] == '-' or value[:1].isdigit()):  # if not a number
-        if value == 'true':
-            return True
-        if value == 'false':
-            return False
-        return value
-    try:
+        return BOOLEAN_VALUES[value] if value in BOOLEAN_VALUES else sys.intern(value)
+    if INTEGER_PATTERN.match(value):  # classify first rather than relying on int() raising for every float
         return int(value)
-    except ValueError:
-        return float(value)
+    return float(value)
+
+
+def lowercase_byte(byte: int) -> bytes:
+    """Return the lowercase form of a single Windows-1252 encoded character. Every cased character in the encoding has
+    its counterpart in the encoding too, so lowercasing can be done on bytes, before decoding. Bytes that are undefined
+    in the encoding are returned unchanged, so that decoding still fails for them."""
+    try:
+        lowered = bytes([byte]).decode('windows-1252').lower().encode('windows-1252')
+    except UnicodeError:
+        return bytes([byte])
+    return lowered if len(lowered) == 1 else bytes([byte])
 
 
 def fold_dict(sequence, fold_values=True) -> Dict[str, Any]:
@@ -121,19 +315,24 @@ def fold_dict(sequence, fold_values=True) -> Dict[str, Any]:
     values are given for the same key, those values are collected into a list. If `fold_values` is true (the default),
     the value for keys with only one value (i.e. they appear only once in the sequence) are "folded" into a primitive
     instead of being a list of one element."""
-    d = dict() if fold_values else defaultdict(list)
-
+    grouped = defaultdict(list)
     for key, value in filter(None, sequence):
-        if not fold_values or (key in d and type(d[key]) is list):
-            d[key].append(value)
-        elif key in d:
-            d[key] = [d[key], value]
-        else:
-            d[key] = value
-    return d
+        grouped[key].append(value)
+
+    if not fold_values:
+        return grouped
+    return {key: values[0] if len(values) == 1 else values for key, values in grouped.items()}
 
 
 DELIMITER_KEY_VALUE = '='
 DELIMITER_COMMENT = ';'
 SECTION_NAME_START = '['
 SECTION_NAME_END = ']'
+BOOLEAN_VALUES = {'true': True, 'false': False}
+INTEGER_PATTERN = re.compile(r'-?\d+(?:_\d+)*\Z')  # the subset of numeric literals that int() accepts
+LOWERCASE_TABLE = bytes.maketrans(bytes(range(256)), b''.join(map(lowercase_byte, range(256))))
+
+_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# path to the signature and contents of each prefetched file (see `paths.prefetch`), held until the file is read
+prefetched: Dict[str, Tuple[Tuple[str, int, int], bytes]] = {}
@@ -11,20 +11,23 @@ Freelancer it is used to store binary assets, like textures and icons.
 
 Reference: <https://wiki.librelancer.net/utf:universal_tree_format>
 """
+import struct
+import mmap
+
 import deconstruct as c
 from . import WinStruct
 
 
 def parse(path):
     result = {}
-    with open(path, 'rb') as f:
-        header = UtfHeader(f.read(56))
+    # map the file into memory, so that each read below is a slice rather than a seek and a read (i.e. two syscalls)
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        header = UtfHeader(m[:56])
 
         entry_count = header.TreeSize // header.EntrySize
 
         # read name dictionary
-        f.seek(header.NamesOffset)
-        dictionary = f.read(header.NamesUsedSize).split(b'\0')
+        dictionary = m[header.NamesOffset:header.NamesOffset + header.NamesUsedSize].split(b'\0')
         position = 0
 
         names = {}
@@ -32,15 +35,11 @@ def parse(path):
             names[position] = name.decode('ascii')
             position += len(name) + 1
 
-        # read data tree
-        f.seek(header.TreeOffset)
-        for e in range(entry_count):
-            entry = UtfEntry(f.read(44))
-            position = f.tell()
-            name = names[entry.DictionaryNameOffset]
-            f.seek(entry.ChildOrDataOffset + header.DataStartOffset)
-            yield name, f.read(entry.UsedDataSize)
-            f.seek(position)
+        # read data tree in one go, unpacking entries to plain tuples of UtfEntry's fields
+        tree = m[header.TreeOffset:header.TreeOffset + entry_count * UTF_ENTRY.size]
+        for _, name_offset, _, _, data_offset, _, used_data_size, *_ in UTF_ENTRY.iter_unpack(tree):
+            data_start = data_offset + header.DataStartOffset
+            yield names[name_offset], m[data_start:data_start + used_data_size]
         return result
 
 
@@ -88,3 +87,6 @@ class UtfEntry(WinStruct):
     CreationTime: c.uint32
     LastAccessTime: c.uint32
     LastWriteTime: c.uint32
+
+
+UTF_ENTRY = struct.Struct(UtfEntry.format_string)  # used to unpack entries in bulk
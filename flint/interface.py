@@ -7,8 +7,9 @@ file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 Interface-related functions, such as routines for translating RDL.
 """
-from typing import Dict
-import xml.etree.ElementTree as xml
+from typing import Dict, Iterable, Pattern
+from html import unescape
+import re
 
 from .formats import ini
 from . import cached, paths
@@ -17,25 +18,19 @@ from . import cached, paths
 def rdl_to_html(rdl: str) -> str:
     """Translate RDL to HTML. Currently this uses a crude lookup table. In future I want to replace this with
     proper interpretation of the XML."""
-    result = rdl
-    for rdl_tag, html_tag in RDL_TO_HTML.items():
-        result = result.replace(rdl_tag, html_tag)
-    return result
+    return RDL_TO_HTML_PATTERN.sub(lambda match: RDL_TO_HTML[match.group()], rdl)
 
 
 def rdl_to_plaintext(rdl: str) -> str:
-    """Translate RDL to plaintext, stripping all tags and replacing <PARA/> with a newline."""
+    """Translate RDL to plaintext, stripping all tags and replacing <PARA/> with a newline. Tags are stripped directly
+    rather than by parsing the document as XML, which is both faster and tolerant of malformed RDL."""
     rdl = rdl.replace('<PARA/>', '\n').replace('</PARA>', '')
-    tree = xml.fromstring(rdl)
-    return xml.tostring(tree, encoding='unicode', method='text')
+    return unescape(RDL_TAG_PATTERN.sub('', rdl))
 
 
 def html_to_rdl(html: str) -> str:
     """Translate HTML to RDL. See the docstring for `rdl_to_html` for more information."""
-    result = html
-    for rdl_tag, html_tag in RDL_TO_HTML.items():
-        result = result.replace(html_tag, rdl_tag)
-    return result
+    return HTML_TO_RDL_PATTERN.sub(lambda match: HTML_TO_RDL[match.group()], html)
 
 @cached
 def get_infocard_map() -> Dict[int, int]:
@@ -79,3 +74,19 @@ RDL_TO_HTML = {
     '<POP/>':                                      '',
     '<?xml version="1.0" encoding="UTF-16"?>':     '',  # xml header; removed for neatness
 }
+
+# the inverse of the above table. Where several RDL tags translate to the same HTML, the first is used. Tags which
+# translate to nothing cannot be restored
+HTML_TO_RDL = {html_tag: rdl_tag for rdl_tag, html_tag in reversed(list(RDL_TO_HTML.items())) if html_tag}
+
+RDL_TAG_PATTERN = re.compile(r'<[^>]+>')  # matches any single tag
+
+
+def alternation(strings: Iterable[str]) -> Pattern:
+    """Compile a pattern matching any of the given strings literally, preferring the longest where several match."""
+    return re.compile('|'.join(map(re.escape, sorted(strings, key=len, reverse=True))))
+
+
+# patterns matching every key of the tables above, so that each translation is a single pass over the input
+RDL_TO_HTML_PATTERN = alternation(RDL_TO_HTML)
+HTML_TO_RDL_PATTERN = alternation(HTML_TO_RDL)
@@ -7,8 +7,12 @@ file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 Functions for working with Freelancer's system layouts and navmaps.
 """
-from typing import Any, Dict, Hashable, List
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Union
 from collections import namedtuple
+from array import array
+from functools import lru_cache
+import itertools
+import heapq
 import math
 
 from . import routines
@@ -16,35 +20,60 @@ from . import cached
 
 PosVector = namedtuple('pos', 'x y z')
 RotVector = namedtuple('rot', 'x y z')
+# a graph stored as parallel lists, where each node is identified by its position in `nodes`. `index` maps a node to its
+# position, and the edges of the node at position i are given by the positions in `neighbours[i]` and the corresponding
+# weights in `weights[i]`
+IndexedGraph = namedtuple('IndexedGraph', 'nodes index neighbours weights')
+
+
+@lru_cache(maxsize=4096, typed=True)
+def pos_vector(x: float, y: float, z: float) -> PosVector:
+    """Return a position vector for the given coordinates. Many solars share positions (e.g. those of a base and its
+    docking ring, or grid-aligned placements), so instances are shared rather than a new one being created for each.
+    `typed` ensures that an int and float coordinate of the same value are not conflated."""
+    return PosVector(x, y, z)
 
 
 def pos_to_sector(pos: PosVector, navmap_scale: float, divider='-', subdivider='/') -> str:
     """Convert a position vector (e.g. (-45000, 0, 75000)) into a navmap sector coordinate (e.g. 'D-5')."""
+    return positions_to_sectors([pos], navmap_scale, divider, subdivider)[0]
+
+
+def positions_to_sectors(positions: Iterable[PosVector], navmap_scale: float, divider='-',
+                         subdivider='/') -> List[str]:
+    """Convert many position vectors in the same system into navmap sector coordinates at once. This is equivalent to
+    calling `pos_to_sector` for each, but the quantities common to every position are only computed once."""
     sector_size = NAVMAP_SECTOR_SIZE / navmap_scale  # calculate size of each square
     system_size = sector_size * 8  # maximum possible x & z
-
-    def quantise(dimension, labels):
-        """Quantise a dimension `dimension` on an axis with labels `labels`."""
-        magnitude = (dimension + system_size / 2) / sector_size  # "absolute magnitude" - a decimal between 0 and 7
-        sector = math.floor(magnitude)
-        subsector = magnitude - sector  # magnitude in the square the point rests in
-        try:
-            result = [labels[sector]]
-        except IndexError:
-            return 'Unknown'
-        if subsector <= 0.2 and sector > 0:  # if it is close to the left/bottom of the square...
-            result.append(labels[sector - 1])  # ...create something like B/C or 2/3
-        elif subsector >= 0.8 and sector < 7:
-            result.append(labels[sector + 1])
-        return subdivider.join(result)
+    # positions are offset and then divided, not multiplied by the reciprocal of the sector size: that rounds
+    # differently, moving positions which lie exactly on a subsector threshold into another subsector
+    half_system_size = system_size / 2
 
     # todo: maybe do something with pos.y < 500 >
-    return divider.join(map(quantise, (pos.x, pos.z), (NAVMAP_X_LABELS, NAVMAP_Z_LABELS)))
+    return [divider.join((quantise((pos.x + half_system_size) / sector_size, NAVMAP_X_LABELS, subdivider),
+                          quantise((pos.z + half_system_size) / sector_size, NAVMAP_Z_LABELS, subdivider)))
+            for pos in positions]
+
+
+def quantise(magnitude: float, labels, subdivider='/') -> str:
+    """Quantise the "absolute magnitude" of a position on a navmap axis with labels `labels` - a decimal between 0 and
+    7 - into a sector label."""
+    sector = math.floor(magnitude)
+    subsector = magnitude - sector  # magnitude in the square the point rests in
+    try:
+        result = [labels[sector]]
+    except IndexError:
+        return 'Unknown'
+    if subsector <= 0.2 and sector > 0:  # if it is close to the left/bottom of the square...
+        result.append(labels[sector - 1])  # ...create something like B/C or 2/3
+    elif subsector >= 0.8 and sector < 7:
+        result.append(labels[sector + 1])
+    return subdivider.join(result)
 
 
 def inter_system_route(from_system: 'System', to_system: 'System'):
     """Find the shortest route (in terms of the number of systems) between two systems."""
-    return dijkstra(generate_universe_graph(), from_system, to_system)
+    return dijkstra(generate_indexed_universe_graph(), from_system, to_system)
 
 
 def intra_system_route(from_solar: 'Solar', to_solar: 'Solar'):
@@ -60,30 +89,67 @@ def generate_universe_graph() -> Dict['System', Dict['System', int]]:
     return {s: {d: 1 for d in s.connections().values()} for s in routines.get_systems()}
 
 
-def dijkstra(graph: Dict[Any, Dict[Any, int]], start: Hashable, end: Hashable) -> List[Hashable]:
-    """An implementation of Dijkstra's algorithm using only builtin types.
+@cached
+def generate_indexed_universe_graph() -> IndexedGraph:
+    """The graph produced by `generate_universe_graph`, in IndexedGraph form."""
+    return index_graph(generate_universe_graph())
+
+
+def index_graph(graph: Dict[Any, Dict[Any, int]]) -> IndexedGraph:
+    """Convert a graph of the form {node: {connected_node: edge_weight}} into an IndexedGraph. Nodes which appear only
+    as neighbours, and not as keys, are included with no neighbours of their own, as in `dijkstra`."""
+    nodes = list(graph)
+    index = {node: i for i, node in enumerate(nodes)}
+    for node in itertools.chain.from_iterable(graph.values()):
+        if node not in index:
+            index[node] = len(nodes)
+            nodes.append(node)
+    neighbours = [[index[n] for n in graph.get(node, ())] for node in nodes]
+    weights = [list(graph.get(node, {}).values()) for node in nodes]
+    return IndexedGraph(nodes, index, neighbours, weights)
+
+
+def dijkstra(graph: Union[Dict[Any, Dict[Any, int]], IndexedGraph], start: Hashable, end: Hashable,
+             heuristic: Optional[Callable[[Hashable, Hashable], float]] = None) -> List[Hashable]:
+    """An implementation of Dijkstra's algorithm using only builtin types, with a binary heap as the priority queue.
 
      Returns the shortest path between `start` and `end` as a list of nodes in order. If no path exists, an empty list
      will be returned.
 
-    `graph` is assumed to be a dictionary of the form {node: {connected_node: edge_weight}}."""
+    `graph` is assumed to be either a dictionary of the form {node: {connected_node: edge_weight}} or an IndexedGraph.
+    Nodes which appear only as neighbours, and not as keys, are treated as having no neighbours of their own.
+
+    If `heuristic` is given, an A* search is performed instead. It should be a function taking two nodes and returning
+    an estimate of the distance between them. For the result to still be a shortest path, this estimate must never
+    exceed the true distance, nor decrease by more than the weight of an edge when moving along it."""
+    if isinstance(graph, IndexedGraph):
+        return indexed_dijkstra(graph, start, end, heuristic)
+
     distances = {node: math.inf for node in graph}
     predecessors = {}  # nodes that lie on a possible path
 
     distances[start] = 0  # distance from the start node is 0
-    to_check = set(graph)  # the set of nodes that need to be checked
-
-    while to_check:  # While there are still nodes to check...
-        closest = min(to_check, key=distances.get)  # find the closest node to the current node
-        to_check.remove(closest)
-
-        for neighbour, weight in graph[closest].items():  # examine neighbours of closest node
-            if neighbour not in to_check:
-                continue
-            new_distance = distances[closest] + weight
-            if new_distance < distances[neighbour]:
+    checked = set()  # the set of nodes whose shortest distance is known
+    # a min-heap of (priority, insertion count, node). The count breaks ties, as nodes themselves may not be comparable
+    queue = [(0, 0, start)]
+    counter = itertools.count(1)
+
+    while queue:  # While there are still nodes to check...
+        _, _, closest = heapq.heappop(queue)  # find the closest node to the current node
+        if closest in checked:
+            continue  # a stale entry, left behind when a shorter path to this node was found
+        if closest == end:
+            break  # the shortest path to the end node is known, so there is no need to explore any further
+        checked.add(closest)
+        distance = distances[closest]
+
+        for neighbour, weight in graph.get(closest, {}).items():  # examine neighbours of closest node
+            new_distance = distance + weight
+            if new_distance < distances.get(neighbour, math.inf):
                 distances[neighbour] = new_distance
                 predecessors[neighbour] = closest
+                priority = new_distance + heuristic(neighbour, end) if heuristic else new_distance
+                heapq.heappush(queue, (priority, next(counter), neighbour))
 
     # now look through the predecessors to find the path
     path = [end]
@@ -95,6 +161,47 @@ def dijkstra(graph: Dict[Any, Dict[Any, int]], start: Hashable, end: Hashable) -
     return list(reversed(path))
 
 
+def indexed_dijkstra(graph: IndexedGraph, start: Hashable, end: Hashable,
+                     heuristic: Optional[Callable[[Hashable, Hashable], float]] = None) -> List[Hashable]:
+    """Equivalent to `dijkstra`, but for a graph in IndexedGraph form. Because nodes are handled by position, distances
+    and predecessors can be held in flat arrays instead of dicts, so the nodes themselves need never be hashed or
+    compared during the search."""
+    nodes, index, neighbours, weights = graph
+    start_index, end_index = index[start], index[end]
+
+    distances = array('d', [math.inf]) * len(nodes)
+    predecessors = [-1] * len(nodes)
+    checked = bytearray(len(nodes))
+
+    distances[start_index] = 0
+    queue = [(0, start_index)]  # positions are comparable, so unlike in `dijkstra` they break ties themselves
+
+    while queue:
+        _, closest = heapq.heappop(queue)
+        if checked[closest]:
+            continue
+        if closest == end_index:
+            break
+        checked[closest] = True
+        distance = distances[closest]
+
+        for neighbour, weight in zip(neighbours[closest], weights[closest]):
+            new_distance = distance + weight
+            if new_distance < distances[neighbour]:
+                distances[neighbour] = new_distance
+                predecessors[neighbour] = closest
+                priority = new_distance + heuristic(nodes[neighbour], end) if heuristic else new_distance
+                heapq.heappush(queue, (priority, neighbour))
+
+    if start_index != end_index and predecessors[end_index] == -1:
+        return []  # no path exists
+
+    path = [end_index]
+    while path[-1] != start_index:
+        path.append(predecessors[path[-1]])
+    return [nodes[i] for i in reversed(path)]
+
+
 NAVMAP_X_LABELS = tuple(chr(x) for x in range(ord('A'), ord('H') + 1))
 NAVMAP_Z_LABELS = tuple(str(x) for x in range(1, 9))
 NAVMAP_SECTOR_SIZE = 34000
@@ -33,23 +33,15 @@ def get_mbases() -> Dict[str, 'MBase']:
 
     Implementation note: because the ordering of these sections is guaranteed (breaking this rule will crash
     Freelancer), it is safe to assume that base is defined in subsequent code paths."""
-    sections = ini.group(paths.construct_path('DATA/MISSIONS/mbases.ini'), fold_sections=False)
-
     bases = []
 
-    for name, contents in sections:
+    for name, contents in ini.stream(paths.construct_path('DATA/MISSIONS/mbases.ini')):
         if name == 'mbase':
-            base = MBase(**contents[0])
-            bases.append(base)
-        elif name == 'mvendor':
-            # noinspection PyUnboundLocalVariable
-            base.vendors.append(MVendor(**contents[0]))
-        elif name == 'basefaction':
-            base.factions.extend(BaseFaction(**faction) for faction in contents)
-        elif name == 'gf_npc':
-            base.npcs.extend(GF_NPC(**npc) for npc in contents if 'nickname' in npc)
-        elif name == 'mroom':
-            base.rooms.extend(MRoom(**room) for room in contents)
+            bases.append(MBase(**contents))
+            continue
+        fold_into_base = MBASE_SUBSECTIONS.get(name)
+        if fold_into_base:
+            fold_into_base(bases[-1], contents)
 
     return {b.nickname: b for b in bases}
 
@@ -70,7 +62,7 @@ def get_news() -> Dict[str, List['NewsItem']]:
 
     return dict(result)
 
-@dataclass
+@dataclass(slots=True)
 class NewsItem:
     """A news item, found in news.ini."""
     category: int
@@ -94,7 +86,7 @@ class NewsItem:
         """This news item's textual content."""
         return dll.lookup(self.text)
 
-@dataclass
+@dataclass(slots=True)
 class MBase:
     """A "mission base" section, found in mbases.ini. Provides additional attributes to the base that nickname refers
     to. The optional fields of this class, as with the following classes, are based on my observations of Discovery
@@ -110,13 +102,13 @@ class MBase:
     rooms: List['MRoom'] = []
 
 
-@dataclass
+@dataclass(slots=True)
 class MVendor:
     """Found in mbases.ini, this section describes the preceding base's mission vendor, aka the "jobs board"."""
     num_offers: Tuple[int, int]
 
 
-@dataclass
+@dataclass(slots=True)
 class BaseFaction:
     """Found in mbases.ini, this section describes an individual NPC present on the preceding base."""
     faction: str
@@ -127,7 +119,7 @@ class BaseFaction:
 
 
 # noinspection PyPep8Naming
-@dataclass
+@dataclass(slots=True)
 class GF_NPC:
     """Found in mbases.ini, this section describes an individual NPC present on the preceding base."""
     nickname: str
@@ -150,7 +142,7 @@ class GF_NPC:
     rumor_type2: Optional[Tuple[str, str, int, int]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class MRoom:
     """Found in mbases.ini, this section describes a particular room in the preceding base."""
     nickname: str
@@ -158,7 +150,7 @@ class MRoom:
     fixture: List[Tuple[str, str, str, str]] = []
 
 
-@dataclass
+@dataclass(slots=True)
 class FactionProps:
     """The FactionProps section, found in faction_prop.ini, defines much of the behaviour of a faction's NPCs in
     space."""
@@ -182,3 +174,33 @@ class FactionProps:
     scan_announce: bool = False
     scan_chance: float = 0.0
     formation: List[Tuple[str, str]]
+
+
+def fold_vendor(base: MBase, vendor: Dict):
+    """Fold an MVendor section into the MBase preceding it."""
+    base.vendors.append(MVendor(**vendor))
+
+
+def fold_faction(base: MBase, faction: Dict):
+    """Fold a BaseFaction section into the MBase preceding it."""
+    base.factions.append(BaseFaction(**faction))
+
+
+def fold_npc(base: MBase, npc: Dict):
+    """Fold a GF_NPC section into the MBase preceding it. Sections without a nickname are ignored."""
+    if 'nickname' in npc:
+        base.npcs.append(GF_NPC(**npc))
+
+
+def fold_room(base: MBase, room: Dict):
+    """Fold an MRoom section into the MBase preceding it."""
+    base.rooms.append(MRoom(**room))
+
+
+# functions which fold each type of section following an MBase into that MBase
+MBASE_SUBSECTIONS = {
+    'mvendor': fold_vendor,
+    'basefaction': fold_faction,
+    'gf_npc': fold_npc,
+    'mroom': fold_room,
+}
@@ -7,11 +7,13 @@ file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 This module provides utilities for working with Freelancer's paths.
 """
-from typing import Dict, Tuple, Optional
+from typing import Dict, Iterable, Tuple, Optional
+import concurrent.futures
+import sys
 import os
 
 from .formats import ini
-from . import cached, invalidate_cache
+from . import cached, invalidate_cache, file_signature
 
 install: Optional[str] = None
 inis: Dict[str, Tuple[str]] = {}  # ini category (defined in freelancer.ini) to a list of paths
@@ -41,31 +43,35 @@ def fix_path_case(path: str) -> str:
     """Thanks to the nature of Windows' file systems, Freelancer frequently uses apparently arbitrary casing for many
     paths. This function takes an absolute path and returns it with the casing as it really is on the filesystem.
 
-    This function mixes iteration/recursion to make the use of dynamic programming more effective. If one recursive
-    function with an additional tail accumulator was used, it would prevent the cache from being effective at storing
-    precomputed known-correct paths."""
-
-    @cached
-    def correct_subpath(path_: str) -> str:
-        """Recursively reduce a path from its end until it diverges from the filesystem's structure. Then, find the
-        correct case for that divergent level and return the subpath."""
-        head, tail = os.path.split(path_)
-        if os.path.exists(head):  # go back till divergence
-            #  tail is now divergent level; find its correct case (taking the first match)
-            correct_case = next(filter(lambda s: s.casefold() == tail.casefold(), os.listdir(head)), None)
-            if correct_case is None:  # if no match possible
-                raise FileNotFoundError
-            return os.path.join(head, correct_case)
-        return correct_subpath(head)
-
+    The path is reduced from its end until it reaches a level that exists. Then, the correct case for each of the
+    remaining levels is looked up in turn in a (cached) map of the contents of its parent directory."""
     path = path.rstrip(r'\/')  # remove trailing slashes which mess up path.split
     if os.name == 'nt':
         return path  # on Windows path.exists ignores case, so no point in continuing
 
-    result = correct_subpath(path)
-    while len(result) != len(path):
-        result = correct_subpath(result + path[len(result):])
-    return result
+    head, divergent = path, []
+    while head and not os.path.exists(head):  # go back till divergence
+        head, tail = os.path.split(head)
+        divergent.append(tail)
+    if not head:
+        raise FileNotFoundError(path)
+
+    for tail in reversed(divergent):
+        correct_case = directory_case_map(head).get(tail.casefold())
+        if correct_case is None:  # if no match possible
+            raise FileNotFoundError(path)
+        head = os.path.join(head, correct_case)
+    return head
+
+
+@cached
+def directory_case_map(directory: str) -> Dict[str, str]:
+    """A map of the casefolded names of the entries in `directory` to their real names. If several names differ only in
+    case, the first listed is used. Maps are cached until the index is next generated (see `generate_index`)."""
+    case_map = {}
+    for name in os.listdir(directory):
+        case_map.setdefault(name.casefold(), name)
+    return case_map
 
 
 def is_probably_freelancer(path, discovery=False):
@@ -88,6 +94,10 @@ def construct_path(*subpath):
 
 def generate_index():
     """Use freelancer.ini to build an index of inis and dlls."""
+    # files may have been added or renamed since the contents of a directory were last listed
+    directory_case_map.cache_clear()
+    fix_path_case.cache_clear()
+
     freelancer_ini = os.path.join(install, 'EXE/freelancer.ini')
     parsed = ini.sections(freelancer_ini, fold_values=False)
 
@@ -97,5 +107,35 @@ def generate_index():
     root = parsed['freelancer'][0]  # todo: also look at 'data path'
     data.update(root)
 
-    dlls.update({i: construct_path('EXE', f) for i, f in enumerate(resources)})
-    inis.update({category: tuple(construct_path('DATA', f) for f in files) for category, files in data.items()})
+    # paths are interned as they are used as cache keys, which can then be compared by identity
+    dlls.update({i: sys.intern(construct_path('EXE', f)) for i, f in enumerate(resources)})
+    inis.update({category: tuple(sys.intern(construct_path('DATA', f)) for f in files)
+                 for category, files in data.items()})
+
+    # files are not prefetched here, as most are never parsed (and the files of each category are read concurrently
+    # anyway when it is). Drop anything prefetched for a previous install
+    ini.prefetched.clear()
+
+
+def read_many(paths: Iterable[str]) -> Dict[str, bytes]:
+    """Read the contents of many files at once. Reads are issued concurrently from a pool of threads (which release
+    the GIL while waiting on the disk), rather than one after another."""
+    def read(path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    paths = list(paths)
+    with concurrent.futures.ThreadPoolExecutor() as readers:
+        return dict(zip(paths, readers.map(read, paths)))
+
+
+def prefetch(paths: Iterable[str]):
+    """Read the files at `paths` into memory ahead of them being parsed, so that parsing them later does not have to
+    wait on the disk. Paths which are not files are ignored. Prefetched contents are only used if the file has not been
+    modified in the meantime.
+
+    The contents of each file are held until it is read, or until `ini.prefetched` is cleared (by `generate_index` or
+    `warm`). A caller which may not go on to read every file should clear them itself once it is done."""
+    signatures = {path: file_signature(path) for path in paths if os.path.isfile(path)}
+    contents = read_many(signatures)
+    ini.prefetched.update({path: (signatures[path], data) for path, data in contents.items()})
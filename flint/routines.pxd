@@ -0,0 +1,15 @@
+# Copyright (C) 2016, 2017, 2020 biqqles.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Static type declarations for the per-solar and per-market-row loops
+# of routines.py, used when the module is compiled with Cython (see
+# setup.py).
+cimport cython
+
+cpdef object classify_object(object o, str system_nickname)
+
+@cython.locals(result=dict, sold=bint)
+cpdef object build_markets(list market, object goods, object bases)
@@ -8,16 +8,18 @@ file, You can obtain one at http://mozilla.org/MPL/2.0/.
 This file contains routines for parsing specific sets of information
 from the game files. All exported functions return EntitySets.
 """
-from typing import Dict, Union
-from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple, Type, Union
+from functools import lru_cache
 import warnings
 
+from dataclassy import fields
+
 from . import paths
-from . import cached
+from . import cached, disk_cached_routine, disk_cache_contains
 from .formats import ini
-from .maps import PosVector
+from .maps import pos_vector
 
-from .entities import EntitySet
+from .entities import Entity, EntitySet
 from .entities import Good, EquipmentGood, CommodityGood, ShipHull, ShipPackage
 from .entities import Commodity, Equipment, Armor, ShieldGenerator, Thruster, Gun, Engine, Power, ShieldBattery, \
     CounterMeasure, CounterMeasureDropper, Scanner, Tractor, CargoPod, CloakingDevice, RepairKit, Mine, MineDropper, \
@@ -29,62 +31,51 @@ from . import entities
 
 
 @cached
+@disk_cached_routine('universe')
 def get_systems() -> EntitySet[System]:
     """All systems defined in the game files."""
     systems = ini.sections(paths.inis['universe'])['system']
-    return EntitySet(System(**s, ids_name=s.pop('strid_name')) for s in systems if 'file' in s)
+    return EntitySet(construct(System, s, ids_name=s.pop('strid_name')) for s in systems if 'file' in s)
 
 
 @cached
+@disk_cached_routine('universe')
 def get_bases() -> EntitySet[Base]:
     """All bases defined in the game files."""
     bases = ini.sections(paths.inis['universe'])['base']
-    return EntitySet(Base(**b, ids_name=b['strid_name']) for b in bases if 'strid_name' in b)
+    return EntitySet(construct(Base, b, ids_name=b['strid_name']) for b in bases if 'strid_name' in b)
 
 
 @cached
+@disk_cached_routine('initial_world')
 def get_factions() -> EntitySet[Faction]:
     """All groups (i.e. factions) defined in the game files."""
-    groups = ini.sections(paths.inis['initial_world'])['group']
-    return EntitySet(Faction(**g) for g in groups)
+    groups = ini.sections(paths.inis['initial_world'], target_section='group')['group']
+    return EntitySet(construct(Faction, g) for g in groups)
 
 
 @cached
+@disk_cached_routine('goods')
 def get_goods() -> EntitySet[Good]:
     """All goods defined in the game files."""
     goods = ini.sections(paths.inis['goods'])['good']
-    result = []
-
-    for g in goods:
-        if g['category'] == 'ship':
-            result.append(ShipPackage(**g))
-        elif g['category'] == 'equipment':
-            result.append(EquipmentGood(**g))
-        elif g['category'] == 'commodity':
-            result.append(CommodityGood(**g))
-        elif g['category'] == 'shiphull':
-            result.append(ShipHull(**g))
-        else:
-            result.append(Good(**g))
-    return EntitySet(result)
+    return EntitySet(construct(GOOD_TYPES.get(g['category'], Good), g) for g in goods)
 
 
 @cached
+@disk_cached_routine('equipment')
 def get_equipment() -> EntitySet[Equipment]:
     """All equipment defined in the game files."""
-    section_name_to_type = {name.lower(): globals()[name] for name in dir(entities) if name in globals()}
-    excluded_sections = {'light', 'tradelane', 'internalfx', 'attachedfx', 'shield', 'lod', 'lootcrate'}
-
     equipment = ini.parse(paths.inis['equipment'])
 
     def generate_entities():
         """Convert equipment sections to entities."""
         for section, contents in equipment:
-            if section in excluded_sections:
+            if section in EXCLUDED_EQUIPMENT_SECTIONS:
                 continue  # not really entities, see docstring for equipment.py
-            if section in section_name_to_type:
+            if section in EQUIPMENT_TYPES:
                 try:
-                    yield section_name_to_type[section](**contents)
+                    yield construct(EQUIPMENT_TYPES[section], contents)
                 except TypeError as e:
                     warnings.warn(f'Failed to initialise equipment of type {section!r} and nickname '
                                   f'{contents.get("nickname")!r}: {e}')
@@ -95,6 +86,7 @@ def get_equipment() -> EntitySet[Equipment]:
 
 
 @cached
+@disk_cached_routine('equipment')
 def get_commodities() -> EntitySet[Commodity]:
     """All commodities defined in the game files. Commodities are actually a type of equipment, so this function
     is for convenience's sake."""
@@ -102,89 +94,171 @@ def get_commodities() -> EntitySet[Commodity]:
 
 
 @cached
+@disk_cached_routine('ships')
 def get_ships() -> EntitySet[Ship]:
     """All ships defined in the game files."""
-    ships = ini.sections(paths.inis['ships'])['ship']
-    result = []
-
-    for s in ships:
-        if 'ids_info3' in s:
-            result.append(Ship(**s))
-
-    return EntitySet(result)
+    ships = ini.sections(paths.inis['ships'], target_section='ship')['ship']
+    return EntitySet(construct(Ship, s) for s in ships if 'ids_info3' in s)
 
 
 @cached
 def get_system_contents(system: System) -> EntitySet[Solar]:
     """All solars (objects and zones) in a given system."""
     result = []
-    contents = ini.parse(system.definition_path())
+    path = system.definition_path()
+    # use the file's contents if they have already been parsed by preload_system_contents
+    contents = preparsed.pop(path, None)
+    if contents is None:
+        contents = ini.parse(path)
 
-    # categorise objects based on their keys
     for solar_type, attributes in contents:
         if 'ids_name' not in attributes:
             continue
         attributes['_system'] = system
-        attributes['pos'] = PosVector(*attributes['pos'])
+        attributes['pos'] = pos_vector(*attributes['pos'])
 
         if solar_type == 'object':
-            o = attributes
-            keys = o.keys()
-            is_planet = 'spin' in keys or 'atmosphere_range' in keys
-
-            if 'base' in keys and 'reputation' in keys:
-                if (o['nickname'] in o['base']) or (system.nickname not in o['base']):
-                    result.append(PlanetaryBase(**o) if is_planet else BaseSolar(**o))
-            elif 'goto' in keys:
-                result.append(Jump(**o))
-            elif 'prev_ring' in keys or 'next_ring' in keys:
-                result.append(TradeLaneRing(**o))
-            elif 'loadout' in keys and 'reputation' not in keys:
-                result.append(Wreck(**o))
-            elif 'star' in keys:
-                result.append(Star(**o))
-            elif is_planet:
-                result.append(Planet(**o))
-            else:
-                result.append(Object(**o))
+            solar_class = classify_object(attributes, system.nickname)
+            if solar_class is not None:
+                result.append(construct(solar_class, attributes))
 
         elif solar_type == 'zone':
-            z = attributes
-            result.append(Zone(**z))
+            result.append(construct(Zone, attributes))
 
     return EntitySet(result)
 
 
+def prefetch_system_contents(systems: Optional[Iterable[System]] = None):
+    """Read the definition files of the given systems (by default, all systems) into memory concurrently, so that
+    later calls to `get_system_contents` for those systems do not each have to wait on the disk. This is worthwhile
+    when the contents of many systems are about to be fetched. Files which are not then read remain in memory until
+    `preload_system_contents` is called for their systems, or `ini.prefetched` is cleared (see `paths.prefetch`)."""
+    if systems is None:
+        systems = get_systems()
+    definition_paths = (system.definition_path() for system in systems)
+    # files already parsed into the disk cache will not be read at all
+    paths.prefetch(path for path in definition_paths if not disk_cache_contains(ini.parse_file.cache_key(path, None)))
+
+
+def preload_system_contents(systems: Optional[Iterable[System]] = None):
+    """Populate the cache of `get_system_contents` for the given systems (by default, all systems). Their definition
+    files are first parsed all at once by `ini.parse_many` (and so concurrently, in the pool of processes if it is
+    enabled), and each system's contents are then built from the results."""
+    systems = list(get_systems() if systems is None else systems)
+    definition_paths = [system.definition_path() for system in systems]
+    preparsed.update({path: [(name, ini.fold_dict(entries)) for name, entries in sections]
+                      for path, sections in zip(definition_paths, ini.parse_many(definition_paths))})
+    try:
+        for system in systems:
+            get_system_contents(system)
+    finally:  # systems whose contents were already cached leave their results unused
+        for path in definition_paths:
+            preparsed.pop(path, None)
+            ini.prefetched.pop(path, None)  # e.g. by prefetch_system_contents, for files found in the disk cache
+
+
 @cached
+@disk_cached_routine('markets', 'goods', 'universe')
 def get_markets() -> Dict[Union[Base, Good], Dict[bool, Dict[Union[Good, Base], int]]]:
     """Market (i.e. economy) data for the universe. Result is of the form
     {base/good nickname -> {whether sold -> (good/base entity, price at base}}."""
-    market = ini.sections(paths.inis['markets'], fold_values=False)['basegood']
+    market = ini.sections(paths.inis['markets'], fold_values=False, target_section='basegood')['basegood']
+
+    return build_markets(market, get_goods(), get_bases())
+
+
+def classify_object(o: dict, system_nickname: str) -> Optional[Type[Solar]]:
+    """Categorise an object section `o` in the system `system_nickname` based on its keys, returning the type of solar
+    it defines, or None if it should be ignored."""
+    keys = o.keys()
+
+    # whether the object is a planet is only tested in the branches where it matters
+    if 'base' in keys and 'reputation' in keys:
+        if (o['nickname'] in o['base']) or (system_nickname not in o['base']):
+            return PlanetaryBase if ('spin' in keys or 'atmosphere_range' in keys) else BaseSolar
+        return None
+    elif 'goto' in keys:
+        return Jump
+    elif 'prev_ring' in keys or 'next_ring' in keys:
+        return TradeLaneRing
+    elif 'loadout' in keys and 'reputation' not in keys:
+        return Wreck
+    elif 'star' in keys:
+        return Star
+    elif 'spin' in keys or 'atmosphere_range' in keys:
+        return Planet
+    else:
+        return Object
+
+
+def build_markets(market: list, goods: EntitySet[Good], bases: EntitySet[Base]):
+    """Build the result of `get_markets` from the parsed basegood sections `market`."""
+    result = {}
+    base_of, good_of = bases.get, goods.get  # bind lookups once rather than per row
 
-    goods = get_goods()
-    bases = get_bases()
-
-    result = defaultdict(lambda: {True: {}, False: {}})
     for b in market:
-        try:
-            base = b['base'][0]
-            base_entity = bases[base]
-        except IndexError:
+        if not b['base']:
             warnings.warn('BaseGood has no base')
             continue
+        base = b['base'][0]
+        base_entity = base_of(base)
+        if base_entity is None:
+            warnings.warn(f'BaseGood refers to undefined base: {base!r}')
+            continue
+        base_market = None  # looked up once per base, when it is first known to have a market
 
         for good, min_rank, min_rep, min_stock, max_stock, depreciate, multiplier, *_ in b['marketgood']:
             if not multiplier:
                 continue
 
-            try:
-                good_entity = goods[good]
-            except KeyError:
+            good_entity = good_of(good)
+            if good_entity is None:
                 warnings.warn(f'BaseGood for base {base!r} refers to undefined good: {good!r}')
                 continue
             sold = not (min_stock == 0 or max_stock == 0)
-            price_at_base = int(round(good_entity.price * multiplier))
-
-            result[base_entity][sold][good_entity] = price_at_base
-            result[good_entity][sold][base_entity] = price_at_base
+            price_at_base = round(good_entity.price * multiplier)  # round returns an int when not given ndigits
+
+            if base_market is None:
+                base_market = result.get(base_entity)
+                if base_market is None:
+                    base_market = result[base_entity] = new_market()
+            good_market = result.get(good_entity)
+            if good_market is None:
+                good_market = result[good_entity] = new_market()
+
+            base_market[sold][good_entity] = price_at_base
+            good_market[sold][base_entity] = price_at_base
     return result
+
+
+def new_market() -> Dict[bool, dict]:
+    """The initial market of a base or good, before any goods or bases have been added. This is also the market of a
+    base or good which does not appear in `get_markets`."""
+    return {True: {}, False: {}}
+
+
+def construct(entity_type: Type[Entity], section: dict, **overrides) -> Entity:
+    """Construct an entity of type `entity_type` from the entries of a parsed INI section, plus any `overrides`. This is
+    equivalent to `entity_type(**section, **overrides)`, but only the entries which are fields of the type are passed
+    on, rather than every entry in the section for the initialiser to discard."""
+    arguments = {field: section[field] for field in entity_fields(entity_type) if field in section}
+    arguments.update(overrides)
+    return entity_type(**arguments)
+
+
+@lru_cache(maxsize=None)
+def entity_fields(entity_type: Type[Entity]) -> Tuple[str, ...]:
+    """The names of all fields, including internal fields, of an entity type."""
+    return tuple(fields(entity_type, internals=True))
+
+
+# the parsed contents of system definition files, keyed by path, awaiting use by get_system_contents
+preparsed: Dict[str, List[Tuple[str, Dict]]] = {}
+# the entity type of a good for each good category. Goods of other categories are plain Goods
+GOOD_TYPES = {'ship': ShipPackage, 'equipment': EquipmentGood, 'commodity': CommodityGood, 'shiphull': ShipHull}
+# the entity type of equipment for each equipment section name
+EQUIPMENT_TYPES = {cls.__name__.lower(): cls for cls in vars(entities).values()
+                   if isinstance(cls, type) and issubclass(cls, Equipment)}
+# equipment sections which do not define entities (see the docstring for equipment.py)
+EXCLUDED_EQUIPMENT_SECTIONS = frozenset({'light', 'tradelane', 'internalfx', 'attachedfx', 'shield', 'lod',
+                                         'lootcrate'})
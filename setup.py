@@ -6,6 +6,32 @@ License, v. 2.0. If a copy of the MPL was not distributed with this
 file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 from setuptools import setup, find_packages
+from setuptools.command.build_ext import build_ext
+
+try:
+    from Cython.Build import cythonize
+except ImportError:  # Cython is optional; without it flint is installed as pure Python
+    cythonize = None
+
+# modules which are compiled with Cython, if it is available. Each must remain valid as plain Python
+COMPILED_MODULES = ['flint/formats/ini.py', 'flint/routines.py']
+
+
+class OptionalBuildExt(build_ext):
+    """Builds extension modules where possible, falling back to the pure-Python modules if there is no working C
+    toolchain."""
+    def run(self):
+        try:
+            super().run()
+        except Exception as e:
+            print(f'Failed to build extension modules, falling back to pure Python: {e}')
+
+    def build_extension(self, ext):
+        try:
+            super().build_extension(ext)
+        except Exception as e:
+            print(f'Failed to build extension module {ext.name!r}, falling back to pure Python: {e}')
+
 
 setup(
     name='fl-flint',  # distribution name
@@ -20,6 +46,9 @@ setup(
     long_description_content_type='text/markdown',
 
     packages=find_packages(),
+    ext_modules=cythonize(COMPILED_MODULES, language_level=3,  # annotations are documentation, types come from .pxd files
+                          compiler_directives={'annotation_typing': False}) if cythonize else [],
+    cmdclass={'build_ext': OptionalBuildExt},
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: Mozilla Public License 2.0 (MPL 2.0)',
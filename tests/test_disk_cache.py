@@ -0,0 +1,124 @@
+"""
+Copyright (C) 2016, 2017, 2020 biqqles.
+
+This Source Code Form is subject to the terms of the Mozilla Public
+License, v. 2.0. If a copy of the MPL was not distributed with this
+file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+Tests for flint's disk cache.
+"""
+from unittest import mock
+import subprocess
+import tempfile
+import unittest
+import pickle
+import sys
+import os
+
+import flint
+
+
+class DiskCacheTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.cache_directory = os.path.join(self.directory, 'cache')
+        for name, value in [('disk_cache_enabled', True), ('disk_cache_directory', self.cache_directory)]:
+            patcher = mock.patch.object(flint, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.path = os.path.join(self.directory, 'file.ini')
+        self.write('[section]\n')
+        self.calls = 0
+
+        def read(path):
+            self.calls += 1
+            with open(path) as f:
+                return f.read()
+        self.read = flint.disk_cached()(read)
+
+    def write(self, contents: str, mtime_ns=10 ** 18):
+        with open(self.path, 'w') as f:
+            f.write(contents)
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def entries(self):
+        return sorted(os.path.relpath(os.path.join(directory, file), self.cache_directory)
+                      for directory, _, files in os.walk(self.cache_directory) for file in files)
+
+    def test_key(self):
+        key = flint.disk_cache_key(('slot',), ('version',))
+        self.assertEqual(key, flint.disk_cache_key(('slot',), ('version',)))
+        new_version = flint.disk_cache_key(('slot',), ('new version',))
+        self.assertEqual(os.path.dirname(new_version), os.path.dirname(key))
+        self.assertNotEqual(new_version, key)
+        self.assertNotEqual(os.path.dirname(flint.disk_cache_key(('other slot',), ('version',))),
+                            os.path.dirname(key))
+
+    def test_hit(self):
+        self.assertEqual(self.read(self.path), '[section]\n')
+        self.assertEqual(self.read(self.path), '[section]\n')
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.entries(), [self.read.cache_key(self.path) + '.pkl'])
+
+    def test_file_changed(self):
+        """Modifying the file, even without changing its size, invalidates its entry, which is then replaced."""
+        self.read(self.path)
+        self.write('[Section]\n', mtime_ns=2 * 10 ** 18)
+        self.assertEqual(self.read(self.path), '[Section]\n')
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(self.entries(), [self.read.cache_key(self.path) + '.pkl'])
+
+    def test_version_changed(self):
+        """Upgrading flint invalidates every entry."""
+        self.read(self.path)
+        with mock.patch.object(flint, 'package_signature', return_value=(('flint/__init__.py', 1, 1),)):
+            self.read(self.path)
+            self.assertEqual(self.entries(), [self.read.cache_key(self.path) + '.pkl'])
+        self.assertEqual(self.calls, 2)
+
+    def test_disabled(self):
+        with mock.patch.object(flint, 'disk_cache_enabled', False):
+            self.assertIsNone(self.read.cache_key(self.path))
+            self.read(self.path)
+            self.read(self.path)
+        self.assertEqual(self.calls, 2)
+        self.assertFalse(os.path.exists(self.cache_directory))
+
+    def test_store(self):
+        """Entries are written whole or not at all, and no temporary files are left behind."""
+        key = flint.disk_cache_key(('slot',), ('version',))
+        flint.disk_cache_store(key, {'a': (1, 2.0)})
+        self.assertEqual(flint.disk_cache_load(key), {'a': (1, 2.0)})
+        self.assertTrue(flint.disk_cache_contains(key))
+        flint.disk_cache_store(key, lambda: None)  # unpicklable
+        self.assertEqual(flint.disk_cache_load(key), {'a': (1, 2.0)})
+        self.assertEqual(self.entries(), [key + '.pkl'])
+
+    def test_corrupt_entry(self):
+        """A truncated or unreadable entry is treated as a miss."""
+        key = flint.disk_cache_key(('slot',), ('version',))
+        flint.disk_cache_store(key, list(range(100)))
+        path = os.path.join(self.cache_directory, key + '.pkl')
+        with open(path, 'r+b') as f:
+            f.truncate(len(pickle.dumps(list(range(100)))) // 2)
+        self.assertRaises(KeyError, flint.disk_cache_load, key)
+        self.assertRaises(KeyError, flint.disk_cache_load, flint.disk_cache_key(('slot',), ('missing',)))
+        self.assertFalse(flint.disk_cache_contains(None))
+
+    def test_environment(self):
+        """The cache is enabled by setting FLINT_DISK_CACHE=1, and is kept under XDG_CACHE_HOME."""
+        environment = dict(os.environ, XDG_CACHE_HOME=self.directory,
+                           PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(flint.__file__))))
+        for value in ('1', '0'):
+            environment['FLINT_DISK_CACHE'] = value
+            output = subprocess.run([sys.executable, '-c', 'import flint; print(flint.disk_cache_enabled, '
+                                     'flint.disk_cache_directory)'], env=environment, stdout=subprocess.PIPE,
+                                    universal_newlines=True, check=True).stdout.split()
+            self.assertEqual(output, [str(value == '1'), os.path.join(self.directory, 'flint')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+Copyright (C) 2016, 2017, 2020 biqqles.
+
+This Source Code Form is subject to the terms of the Mozilla Public
+License, v. 2.0. If a copy of the MPL was not distributed with this
+file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+Tests for flint.entities.
+"""
+import unittest
+import pickle
+import sys
+
+from flint.entities import EntitySet, Base
+
+
+class EntitySetTest(unittest.TestCase):
+    def setUp(self):
+        self.bases = EntitySet([Base(nickname='li01_01_base', ids_name=1, ids_info=2, system='li01'),
+                                Base(nickname='li01_02_base', ids_name=3, ids_info=4, system='li01')])
+
+    def test_get(self):
+        self.assertIs(self.bases.get('li01_01_base'), self.bases['li01_01_base'])
+
+    def test_get_missing(self):
+        self.assertIsNone(self.bases.get('li02_01_base'))
+        sentinel = object()
+        self.assertIs(self.bases.get('li02_01_base', sentinel), sentinel)
+
+    def test_get_non_string(self):
+        """Keys which are not strings are never found, even if they are equal to a nickname, as for `__getitem__` and
+        `__contains__`. Unhashable keys do not raise."""
+        str_subclass = type('Nickname', (str,), {})('li01_01_base')
+        for key in (None, 1, ('li01_01_base',), ['li01_01_base'], str_subclass):
+            with self.subTest(key=key):
+                self.assertIsNone(self.bases.get(key))
+                self.assertEqual(self.bases.get(key, 'default'), 'default')
+                self.assertNotIn(key, self.bases)
+        self.assertRaises(TypeError, self.bases.__getitem__, 1)
+
+    def test_pickle(self):
+        """Keys are re-interned when an EntitySet is unpickled."""
+        bases = pickle.loads(pickle.dumps(self.bases))
+        self.assertEqual(bases, self.bases)
+        self.assertTrue(all(sys.intern(key) is key for key in bases.keys()))
+
+
+if __name__ == '__main__':
+    unittest.main()
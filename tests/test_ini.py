@@ -0,0 +1,112 @@
+"""
+Copyright (C) 2016, 2017, 2020 biqqles.
+
+This Source Code Form is subject to the terms of the Mozilla Public
+License, v. 2.0. If a copy of the MPL was not distributed with this
+file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+Tests for flint.formats.ini.
+"""
+import unittest
+import sys
+
+from flint.formats import ini
+
+SYSTEM = b"""[Object]
+nickname = li01_01
+pos = 1, 2, 3 ; [not a header]
+archetype = planet
+
+;[Object]
+nickname = li01_02
+pos = 4, 5, 6
+archetype = planet
+
+ ; ; [Object]
+nickname = li01_03
+pos = 7, 8, 9
+
+[Zone] ; a comment
+nickname = zone_li01_01
+pos = 0, 0, 0
+"""
+
+
+class CommentedHeaderTest(unittest.TestCase):
+    """A section whose header is commented out should be skipped entirely, rather than its entries being merged into
+    the preceding section."""
+    def test_sections(self):
+        sections = [(name, ini.fold_dict(entries)) for name, entries in ini.parse_data(SYSTEM)]
+        self.assertEqual(sections, [('object', {'nickname': 'li01_01', 'pos': (1, 2, 3), 'archetype': 'planet'}),
+                                    ('zone', {'nickname': 'zone_li01_01', 'pos': (0, 0, 0)})])
+
+    def test_target_section(self):
+        sections = [(name, ini.fold_dict(entries)) for name, entries in ini.parse_data(SYSTEM, 'Object')]
+        self.assertEqual(sections, [('object', {'nickname': 'li01_01', 'pos': (1, 2, 3), 'archetype': 'planet'})])
+
+
+
+class AutoCastTest(unittest.TestCase):
+    def test_integers(self):
+        for value, expected in [('1', 1), ('0', 0), ('-12', -12), (' 42 ', 42), ('007', 7), ('1_000', 1000)]:
+            with self.subTest(value=value):
+                self.assertEqual(ini.auto_cast(value), expected)
+                self.assertIs(type(ini.auto_cast(value)), int)
+
+    def test_floats(self):
+        for value, expected in [('1.5', 1.5), ('-0.25', -0.25), ('1e3', 1000.0), ('-1.5e-2', -0.015), ('10.', 10.0)]:
+            with self.subTest(value=value):
+                self.assertEqual(ini.auto_cast(value), expected)
+                self.assertIs(type(ini.auto_cast(value)), float)
+
+    def test_booleans(self):
+        self.assertIs(ini.auto_cast('true'), True)
+        self.assertIs(ini.auto_cast(' false'), False)
+
+    def test_strings(self):
+        """Only values beginning with a digit or minus sign are numbers, so other values that Python would accept as
+        numbers remain strings. Booleans are matched case-sensitively, as sections are lowercased before parsing."""
+        for value in ['+5', '.5', 'inf', 'nan', 'True', 'li01_01_base', 'a b']:
+            with self.subTest(value=value):
+                self.assertEqual(ini.auto_cast(value), value)
+        self.assertEqual(ini.auto_cast('  li01  '), 'li01')
+        self.assertIs(ini.auto_cast(''.join(['li01', '_base'])), sys.intern('li01_base'))
+
+    def test_invalid_numbers(self):
+        """Values that begin like a number but are not one are invalid, which invalidates their section."""
+        for value in ['12abc', '-', '0x10', '1 000']:
+            with self.subTest(value=value):
+                self.assertRaises(ValueError, ini.auto_cast, value)
+
+    def test_tuples(self):
+        self.assertEqual(ini.parse_value(' 1, -2.5, li01, true,+3'), (1, -2.5, 'li01', True, '+3'))
+        self.assertEqual(ini.parse_value('li01'), 'li01')
+
+
+
+class LowercaseTest(unittest.TestCase):
+    """Files are lowercased by translating their bytes before decoding, which must give the same result as decoding
+    and then lowercasing."""
+    def test_table(self):
+        for byte in range(256):
+            with self.subTest(byte=byte):
+                try:
+                    expected = bytes([byte]).decode('windows-1252').lower()
+                except UnicodeError:  # undefined in the encoding
+                    self.assertEqual(bytes([byte]).translate(ini.LOWERCASE_TABLE), bytes([byte]))
+                    continue
+                self.assertEqual(bytes([byte]).translate(ini.LOWERCASE_TABLE).decode('windows-1252'), expected)
+
+    def test_parse(self):
+        text = '[Object]\nNickName = Li01_Trade_Lane_Ring_1\nArchetype = Trade_Lane_Ring\n' \
+               '[ZONE]\nnickname = ZONE_Li01_Église_ÀÖÞ\nIDS_Info = 66_000\nBoolean = TRUE, False\n'
+        data = text.encode('windows-1252')
+        self.assertEqual(ini.parse_data(data), ini.parse_data(text.lower().encode('windows-1252')))
+        self.assertEqual([(name, ini.fold_dict(entries)) for name, entries in ini.parse_data(data)],
+                         [('object', {'nickname': 'li01_trade_lane_ring_1', 'archetype': 'trade_lane_ring'}),
+                          ('zone', {'nickname': 'zone_li01_église_àöþ', 'ids_info': 66000,
+                                    'boolean': (True, False)})])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+Copyright (C) 2016, 2017, 2020 biqqles.
+
+This Source Code Form is subject to the terms of the Mozilla Public
+License, v. 2.0. If a copy of the MPL was not distributed with this
+file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+Tests for flint.interface.
+"""
+import unittest
+
+from flint import interface
+
+BOLD = '<TRA data="1" mask="1" def="-2"/>'
+UNBOLD = '<TRA data="0" mask="1" def="-1"/>'
+RDL = ('<?xml version="1.0" encoding="UTF-16"?><RDL><PUSH/><TEXT>Planet Manhattan</TEXT><PARA/>'
+       f'{BOLD}<TEXT>Gravity: </TEXT>{UNBOLD}<TEXT>Earth-like &amp; stable</TEXT><PARA/>'
+       '<JUST loc="center"/><TEXT>Population: &lt;5,000,000&gt;</TEXT><POP/></RDL>')
+
+
+class RdlTest(unittest.TestCase):
+    def test_rdl_to_html(self):
+        self.assertEqual(interface.rdl_to_html(RDL), 'Planet Manhattan<p><b>Gravity: </b>Earth-like &amp; stable<p>'
+                                                     '<p align="center">Population: &lt;5,000,000&gt;')
+
+    def test_round_trip(self):
+        """Translating to HTML and back gives the original RDL, less the tags which have no HTML equivalent."""
+        rdl = f'Planet Manhattan<PARA/>{BOLD}Gravity: {UNBOLD}Earth-like &amp; stable<PARA/><JUST loc="center"/>'
+        self.assertEqual(interface.html_to_rdl(interface.rdl_to_html(rdl)), rdl)
+        self.assertEqual(interface.html_to_rdl(interface.rdl_to_html(RDL)), rdl + 'Population: &lt;5,000,000&gt;')
+
+    def test_tag_round_trip(self):
+        """Every HTML tag produced translates back to an RDL tag which produces it again, preferring the longest
+        match where one tag is a prefix of another."""
+        for html in interface.HTML_TO_RDL:
+            with self.subTest(html=html):
+                rdl = interface.html_to_rdl(html)
+                self.assertEqual(rdl, interface.HTML_TO_RDL[html])
+                self.assertEqual(interface.rdl_to_html(rdl), html)
+
+    def test_plaintext(self):
+        self.assertEqual(interface.rdl_to_plaintext(RDL),
+                         'Planet Manhattan\nGravity: Earth-like & stable\nPopulation: <5,000,000>')
+        self.assertEqual(interface.rdl_to_plaintext('<TEXT>&quot;A&quot; &amp;amp;</TEXT><PARA/>'), '"A" &amp;\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
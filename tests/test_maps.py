@@ -0,0 +1,67 @@
+"""
+Copyright (C) 2016, 2017, 2020 biqqles.
+
+This Source Code Form is subject to the terms of the Mozilla Public
+License, v. 2.0. If a copy of the MPL was not distributed with this
+file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+Tests for flint.maps.
+"""
+import unittest
+
+from flint import maps
+
+
+class DijkstraTest(unittest.TestCase):
+    GRAPH = {'a': {'b': 1, 'c': 5}, 'b': {'c': 1}, 'c': {}, 'd': {}}
+
+    def route(self, graph, start, end):
+        return maps.dijkstra(graph, start, end)
+
+    def test_shortest_path(self):
+        self.assertEqual(self.route(self.GRAPH, 'a', 'c'), ['a', 'b', 'c'])
+
+    def test_no_path(self):
+        self.assertEqual(self.route(self.GRAPH, 'a', 'd'), [])
+
+    def test_neighbour_not_in_graph(self):
+        graph = {'a': {'b': 1, 'x': 1}, 'b': {}}
+        self.assertEqual(self.route(graph, 'a', 'b'), ['a', 'b'])
+        self.assertEqual(self.route(graph, 'a', 'x'), ['a', 'x'])
+
+
+class IndexedDijkstraTest(DijkstraTest):
+    """The same tests, for graphs converted to IndexedGraph form."""
+    def route(self, graph, start, end):
+        return maps.dijkstra(maps.index_graph(graph), start, end)
+
+
+class PosToSectorTest(unittest.TestCase):
+    """Positions lying exactly on a subsector threshold (a fifth of a sector from an edge) are sensitive to the
+    rounding of the conversion to sector units, so their sectors are pinned to those given by the original
+    implementation."""
+    CASES = [
+        ((-108800, 0, -95200), 1, 'A/B-2/1'),  # exactly on thresholds
+        ((-74800, 0, 27200), 1, 'B/C-5'),
+        ((0, 0, 68000), 1, 'E/D-7/6'),
+        ((-54400, 0, -47600), 2, 'A/B-2/1'),
+        ((-45000, 0, 45000), 1.36, 'C-6'),
+        ((-108801, 0, -95199), 1, 'A-2'),  # either side of them
+        ((-108799, 0, -95201), 1, 'A/B-2/1'),
+        ((-44999, 0, 45001), 1.36, 'C-6/7'),
+        ((61200, 0, 115600), 1, 'F-8'),
+        ((136000, 0, -136000), 1, 'Unknown-1'),  # off the map
+    ]
+
+    def test_thresholds(self):
+        for pos, navmap_scale, sector in self.CASES:
+            with self.subTest(pos=pos, navmap_scale=navmap_scale):
+                self.assertEqual(maps.pos_to_sector(maps.PosVector(*pos), navmap_scale), sector)
+
+    def test_positions_to_sectors(self):
+        positions = [maps.PosVector(*pos) for pos, _, _ in self.CASES]
+        self.assertEqual(maps.positions_to_sectors(positions, 1), [maps.pos_to_sector(p, 1) for p in positions])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Copyright (C) 2016, 2017, 2020 biqqles.
+
+This Source Code Form is subject to the terms of the Mozilla Public
+License, v. 2.0. If a copy of the MPL was not distributed with this
+file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+Tests for flint.routines.
+"""
+from collections import defaultdict
+import unittest
+import warnings
+
+from flint import routines
+from flint.entities import EntitySet, Base, Good, Equipment, Gun, Munition, Jump, Star
+
+
+class EquipmentTypesTest(unittest.TestCase):
+    def test_equipment_sections(self):
+        self.assertIs(routines.EQUIPMENT_TYPES['gun'], Gun)
+        self.assertIs(routines.EQUIPMENT_TYPES['munition'], Munition)
+        self.assertTrue(all(issubclass(t, Equipment) for t in routines.EQUIPMENT_TYPES.values()))
+
+    def test_other_names(self):
+        for name in ('list', 'type', 'entity', 'entityset', 'ship', 'system', 'cached', 'paths', '__builtins__'):
+            self.assertNotIn(name, routines.EQUIPMENT_TYPES)
+
+
+
+class ClassifyObjectTest(unittest.TestCase):
+    def test_dict_subclass(self):
+        """Sections may be given as any mapping type, including the defaultdicts returned by `ini.sections`."""
+        self.assertIs(routines.classify_object(defaultdict(list, {'nickname': 'li01_sun', 'star': 'med_white_sun'}),
+                                               'li01'), Star)
+        self.assertIs(routines.classify_object({'nickname': 'li01_to_li02', 'goto': ('li02', 'x', 'y')}, 'li01'), Jump)
+
+
+
+class BuildMarketsTest(unittest.TestCase):
+    def setUp(self):
+        self.bases = EntitySet([Base(nickname='li01_01_base', ids_name=1, ids_info=2, system='li01')])
+        self.goods = EntitySet([Good(nickname='commodity_water', ids_name=3, ids_info=4, price=100),
+                                Good(nickname='commodity_oxygen', ids_name=5, ids_info=6, price=50)])
+
+    def build(self, market):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            result = routines.build_markets(market, self.goods, self.bases)
+        return result, [str(w.message) for w in caught]
+
+    def test_markets(self):
+        """A good is sold at a base unless its minimum or maximum stock is zero, in which case it is only bought.
+        Goods with a price multiplier of zero are not traded at all."""
+        result, caught = self.build([{'base': ['li01_01_base'],
+                                      'marketgood': [('commodity_water', 0, -1, 10, 20, 0, 1.5),
+                                                     ('commodity_oxygen', 0, -1, 0, 0, 0, 1),
+                                                     ('commodity_water', 0, -1, 10, 20, 0, 0)]}])
+        base, water, oxygen = self.bases['li01_01_base'], self.goods['commodity_water'], self.goods['commodity_oxygen']
+        self.assertEqual(caught, [])
+        self.assertEqual(result, {base: {True: {water: 150}, False: {oxygen: 50}},
+                                  water: {True: {base: 150}, False: {}},
+                                  oxygen: {True: {}, False: {base: 50}}})
+
+    def test_undefined_base(self):
+        result, caught = self.build([{'base': ['li99_01_base'],
+                                      'marketgood': [('commodity_water', 0, -1, 10, 20, 0, 1)]},
+                                     {'base': [], 'marketgood': []}])
+        self.assertEqual(result, {})
+        self.assertEqual(caught, ["BaseGood refers to undefined base: 'li99_01_base'", 'BaseGood has no base'])
+
+    def test_undefined_good(self):
+        result, caught = self.build([{'base': ['li01_01_base'],
+                                      'marketgood': [('commodity_unobtainium', 0, -1, 10, 20, 0, 1)]}])
+        self.assertEqual(result, {})
+        self.assertEqual(caught, ["BaseGood for base 'li01_01_base' refers to undefined good: 'commodity_unobtainium'"])
+
+
+if __name__ == '__main__':
+    unittest.main()